@@ -13,6 +13,7 @@ from src.sentiment_analyzer import SentimentAnalyzer
 from src.trend_analyzer import TrendAnalyzer
 from src.conversational_agent import ConversationalAgent
 from src.llm_handler import LLMHandler
+from src.article_text import attach_analysis_text
 from config import CATEGORIES, DATA_DIR
 
 import nltk
@@ -78,11 +79,9 @@ def load_models():
     sentiment_analyzer = SentimentAnalyzer()
     trend_analyzer = TrendAnalyzer()
     
-    # Initialize LLM
+    # Initialize LLM (the model itself is loaded on first use)
     try:
-        with st.spinner("Loading AI model (first time may take 2-3 minutes)..."):
-            llm_handler = LLMHandler()
-        st.success("AI model loaded successfully!")
+        llm_handler = LLMHandler()
     except Exception as e:
         st.warning(f"LLM not available: {e}. Using rule-based responses.")
         llm_handler = None
@@ -101,6 +100,9 @@ def fetch_and_process_news(category=None):
     if not articles:
         return []
     
+    # Title + summary text shared by the sentiment and trend stages
+    articles = attach_analysis_text(articles)
+    
     articles = categorizer.categorize_batch(articles)
     articles = sentiment_analyzer.analyze_batch(articles)
     
@@ -375,10 +377,11 @@ def main():
             st.subheader("Sentiment by Category")
             sentiment_by_cat = []
             for article in articles:
+                sentiment = article.get('sentiment', {})
                 sentiment_by_cat.append({
                     'Category': article.get('category', 'General'),
-                    'Sentiment': article.get('sentiment', {}).get('label', 'neutral'),
-                    'Polarity': article.get('sentiment', {}).get('polarity', 0)
+                    'Sentiment': sentiment.get('label', 'neutral'),
+                    'Polarity': sentiment.get('polarity', 0)
                 })
             
             df_sent_cat = pd.DataFrame(sentiment_by_cat)
@@ -445,10 +448,9 @@ def main():
             query_lower = search_query.lower()
             
             for article in articles:
-                title = article.get('title', '').lower()
-                summary = article.get('summary', '').lower()
-                
-                if query_lower in title or query_lower in summary:
+                # Only lowercase the summary when the title doesn't already match.
+                if (query_lower in article.get('title', '').lower()
+                        or query_lower in article.get('summary', '').lower()):
                     search_results.append(article)
             
             st.write(f"Found {len(search_results)} results for '{search_query}'")
@@ -90,8 +90,17 @@ CATEGORIES = [
 # Model configurations
 SUMMARIZATION_MODEL = "simple"
 EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+LLM_CACHE_SIZE = 512
+LLM_SEMANTIC_CACHE = False  # reuse answers for near-duplicate prompts (needs sentence-transformers)
+LLM_SEMANTIC_CACHE_THRESHOLD = 0.92
+LLM_QUANTIZE_INT8 = True  # dynamic int8 weights for CPU inference; False keeps FP32
 
 # App settings
 MAX_ARTICLES_PER_FETCH = 50
+RSS_FETCH_WORKERS = 10
+ENRICH_WORKERS = 8
+RSS_MAX_BYTES = 256 * 1024
+HTTP_CACHE_PATH = DATA_DIR / "http_cache"  # shelve of ETag/Last-Modified + bodies
+HTTP_CACHE_MAX_BYTES = 64 * 1024 * 1024  # start a fresh cache once its files exceed this
 SUMMARY_MAX_LENGTH = 150
 SUMMARY_MIN_LENGTH = 50
@@ -0,0 +1,19 @@
+from typing import List, Dict
+
+# Key under which the app pipeline stores each article's analysis text
+ANALYSIS_TEXT_KEY = '_analysis_text'
+
+
+def analysis_text(article: Dict) -> str:
+    """Title and summary as one string, reusing the precomputed value if present."""
+    text = article.get(ANALYSIS_TEXT_KEY)
+    if text is None:
+        text = f"{article.get('title', '')} {article.get('summary', '')}"
+    return text
+
+
+def attach_analysis_text(articles: List[Dict]) -> List[Dict]:
+    """Store the analysis text on each article so later stages don't rebuild it."""
+    for article in articles:
+        article[ANALYSIS_TEXT_KEY] = analysis_text(article)
+    return articles
@@ -46,24 +46,28 @@ class ArticleCategorizer:
                 'conflict', 'war', 'peace'
             ]
         }
+        
+        # Flat (keyword, category) pairs in category order, so scoring is a
+        # single pass over one tuple instead of nested dict/list iteration.
+        self._keyword_table = tuple(
+            (keyword, category)
+            for category, keywords in self.category_keywords.items()
+            for keyword in keywords
+        )
     
     def categorize(self, article):
         text = article.get('title', '').lower()
         summary = article.get('summary', '').lower()
-        full_text = text + ' ' + summary
         
         category_scores = {}
         
-        for category, keywords in self.category_keywords.items():
-            score = 0
-            for keyword in keywords:
-                if keyword in text:
-                    score += 3
-                elif keyword in full_text:
-                    score += 1
-            
-            if score > 0:
-                category_scores[category] = score
+        # Keywords are single words, so checking the summary on its own is
+        # equivalent to checking title + summary without rescanning the title.
+        for keyword, category in self._keyword_table:
+            if keyword in text:
+                category_scores[category] = category_scores.get(category, 0) + 3
+            elif keyword in summary:
+                category_scores[category] = category_scores.get(category, 0) + 1
         
         if category_scores:
             return max(category_scores, key=category_scores.get)
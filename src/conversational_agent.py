@@ -1,71 +1,248 @@
-from collections import Counter
+from bisect import bisect_right
+from collections import Counter, OrderedDict, defaultdict, deque
 from datetime import datetime
 import re
+import time
 import logging
 
 logger = logging.getLogger(__name__)
 
+RESPONSE_CACHE_SIZE = 256
+
+HISTORY_MAX_ENTRIES = 512
+
+_WORD_RE = re.compile(r'\b[a-z]{4,}\b')
+
+TRENDING_STOPWORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'is', 'are', 'says'
+})
+
+QUERY_STOPWORDS = frozenset({'the', 'news', 'tell', 'show', 'what', 'latest', 'today', 'about', 'find'})
+
+UK_SOURCES = ['BBC', 'Sky News', 'The Guardian', 'Independent', 'Telegraph']
+
+_UK_SOURCE_RE = re.compile('|'.join(map(re.escape, UK_SOURCES)))
+
+GREETING_MESSAGE = (
+    "Hello! I'm NewsGenie AI, your intelligent news assistant.\n\n"
+    "I can help you:\n"
+    "- Get latest headlines and UK news\n"
+    "- Find news on specific topics\n"
+    "- Analyze sentiment and trends\n"
+    "- Answer questions about the news\n\n"
+    "What would you like to know?"
+)
+
+HELP_MESSAGE = (
+    "**Here's what I can do:**\n\n"
+    "**Get News:**\n"
+    "- What are the top stories?\n"
+    "- Show me UK news\n"
+    "- Latest sports/technology/business news\n\n"
+    "**Search & Analyze:**\n"
+    "- Tell me about [topic]\n"
+    "- What's trending?\n"
+    "- What's the sentiment?\n\n"
+    "**Statistics:**\n"
+    "- How many articles are there?\n"
+)
+
+CATEGORIES = ('technology', 'sports', 'business', 'finance', 'politics', 'health', 'science')
+
+# Intent triggers in priority order: when a query matches several intents,
+# the one listed first wins.
+INTENTS = [
+    ('greeting', ['hello', 'hi', 'hey']),
+    ('help', ['help']),
+    ('uk_news', ['uk news', 'british news', 'latest uk', 'news uk', 'uk today']),
+    ('top_stories', ['top stories', 'top news', 'latest news', 'headlines', 'news today']),
+    ('trending', ['trending', 'popular']),
+    ('sentiment', ['sentiment']),
+    ('count', ['how many', 'count']),
+    *((category, [category]) for category in CATEGORIES),
+    ('summarize', ['summarize', 'summary']),
+]
+
+INTENT_HANDLERS = {
+    'greeting': 'handle_greeting',
+    'help': 'handle_help',
+    'uk_news': 'get_uk_news',
+    'top_stories': 'get_top_stories',
+    'trending': 'get_trending',
+    'sentiment': 'get_sentiment',
+    'count': 'get_count',
+    'summarize': 'get_top_stories',
+}
+
+_INTENT_PRIORITY = {name: i for i, (name, _) in enumerate(INTENTS)}
+
+_TOKEN_RE = re.compile(r'\b[a-z]+\b')
+
+# Single-word triggers are matched against the query's token set; only
+# multi-word phrases need a substring scan.
+_WORD_INTENTS = {
+    trigger: _INTENT_PRIORITY[name]
+    for name, triggers in reversed(INTENTS) for trigger in triggers if ' ' not in trigger
+}
+
+# One alternation per intent wrapped in a lookahead, so a single scan reports
+# the highest-priority phrase starting at every position, overlaps included.
+_PHRASE_RE = re.compile('(?=' + '|'.join(
+    f"(?P<{name}>{'|'.join(re.escape(t) for t in triggers if ' ' in t)})"
+    for name, triggers in INTENTS if any(' ' in t for t in triggers)
+) + ')')
+
+
+# Phrase scans can be skipped when a word trigger already outranks every phrase.
+_MIN_PHRASE_PRIORITY = min(_INTENT_PRIORITY[name] for name in _PHRASE_RE.groupindex)
+
+
+def _match_intent(query_lower, tokens):
+    """Return the highest-priority intent triggered by the query."""
+    best = min((_WORD_INTENTS[t] for t in tokens if t in _WORD_INTENTS), default=None)
+    if (best is not None and best < _MIN_PHRASE_PRIORITY) or ' ' not in query_lower:
+        return INTENTS[best][0] if best is not None else None
+    
+    for match in _PHRASE_RE.finditer(query_lower):
+        priority = _INTENT_PRIORITY[match.lastgroup]
+        if best is None or priority < best:
+            best = priority
+    return INTENTS[best][0] if best is not None else None
+
+
+class _ArticleView:
+    """Display fields of one article, with defaults resolved once at index time."""
+    
+    __slots__ = ('title', 'source', 'category', 'sentiment_label')
+    
+    def __init__(self, title, source, category, sentiment_label):
+        self.title = title
+        self.source = source
+        self.category = category
+        self.sentiment_label = sentiment_label
+
 
 class ConversationalAgent:
     
     def __init__(self, articles, llm_handler=None):
         self.articles = articles
         self.llm_handler = llm_handler
-        self.conversation_history = []
+        self.conversation_history = deque(maxlen=HISTORY_MAX_ENTRIES)
         self.use_llm = llm_handler is not None
-        
+    
+    @property
+    def articles(self):
+        return self._articles
+    
+    @articles.setter
+    def articles(self, articles):
+        # Streamlit reassigns an equal copy of the cached articles on every
+        # rerun; keep the index and response cache unless the content changed.
+        if hasattr(self, '_articles') and (articles is self._articles or articles == self._articles):
+            return
+        self._articles = articles
+        self._index_ready = False
+        self._response_cache = OrderedDict()
+    
+    def add_articles(self, new_articles):
+        new_articles = list(new_articles)
+        self._articles.extend(new_articles)
+        self._response_cache.clear()
+        if self._index_ready:
+            self._index_articles(new_articles)
+    
+    def _ensure_index(self):
+        """Build the per-article columns and counters on first use after articles change."""
+        if self._index_ready:
+            return
+        
+        self._total = 0
+        self._records = []
+        self._titles_lower = []
+        self._by_category = defaultdict(list)
+        self._uk_idx = []
+        self._title_offsets = []
+        self._category_counter = Counter()
+        self._sentiment_counter = Counter()
+        self._trending_counter = Counter()
+        self._index_articles(self._articles)
+        self._index_ready = True
+    
+    def _index_articles(self, articles):
+        """Append per-article columns so handlers don't re-read each dict per query."""
+        start = self._total
+        for i, article in enumerate(articles, start):
+            title_lower = article.get('title', '').lower()
+            source = article.get('source', '')
+            category = article.get('category', 'General')
+            sentiment = article.get('sentiment', {}).get('label', 'neutral')
+            
+            self._records.append(_ArticleView(
+                article.get('title', 'No title'),
+                article.get('source', 'Unknown'),
+                category,
+                sentiment,
+            ))
+            self._titles_lower.append(title_lower)
+            self._by_category[article.get('category', '').lower()].append(i)
+            if _UK_SOURCE_RE.search(source):
+                self._uk_idx.append(i)
+            
+            self._category_counter[category] += 1
+            self._sentiment_counter[sentiment] += 1
+        
+        # Tokenize all new titles with one regex scan instead of one call per title.
+        blob = '\n'.join(self._titles_lower[start:])
+        self._trending_counter.update(w for w in _WORD_RE.findall(blob) if w not in TRENDING_STOPWORDS)
+        
+        offset = self._title_offsets[-1] + len(self._titles_lower[start - 1]) + 1 if start else 0
+        for title_lower in self._titles_lower[start:]:
+            self._title_offsets.append(offset)
+            offset += len(title_lower) + 1
+        self._titles_blob = '\n'.join(self._titles_lower)
+        self._total = len(self._records)
+    
     def process_query(self, user_query):
-        query_lower = user_query.lower().strip()
+        query_lower = ' '.join(user_query.lower().split())
+        tokens = frozenset(_TOKEN_RE.findall(query_lower))
+        timestamp_ns = time.time_ns()
         
         self.conversation_history.append({
             'role': 'user',
             'content': user_query,
-            'timestamp': datetime.now()
+            'timestamp_ns': timestamp_ns
         })
         
-        response = self.generate_response(query_lower, user_query)
+        # Responses only depend on the normalized query and the current
+        # articles, and the cache is cleared whenever articles change.
+        response = self._response_cache.get(query_lower)
+        if response is None:
+            response = self.generate_response(query_lower, user_query, tokens)
+            self._response_cache[query_lower] = response
+            if len(self._response_cache) > RESPONSE_CACHE_SIZE:
+                self._response_cache.popitem(last=False)
+        else:
+            self._response_cache.move_to_end(query_lower)
         
         self.conversation_history.append({
             'role': 'assistant',
             'content': response,
-            'timestamp': datetime.now()
+            'timestamp_ns': timestamp_ns
         })
         
         return response
     
-    def generate_response(self, query_lower, original_query):
-        if any(word in query_lower for word in ['hello', 'hi', 'hey']):
-            return self.handle_greeting()
-        
-        if 'help' in query_lower:
-            return self.handle_help()
-        
-        if any(phrase in query_lower for phrase in ['uk news', 'british news', 'latest uk', 'news uk', 'uk today']):
-            return self.get_uk_news()
-        
-        if any(phrase in query_lower for phrase in ['top stories', 'top news', 'latest news', 'headlines', 'news today']):
-            return self.get_top_stories()
-        
-        if any(word in query_lower for word in ['trending', 'popular']):
-            return self.get_trending()
-        
-        if 'sentiment' in query_lower:
-            return self.get_sentiment()
+    def generate_response(self, query_lower, original_query, tokens=None):
+        if tokens is None:
+            tokens = frozenset(_TOKEN_RE.findall(query_lower))
         
-        if any(phrase in query_lower for phrase in ['how many', 'count']):
-            return self.get_count()
+        intent = _match_intent(query_lower, tokens)
+        if intent in CATEGORIES:
+            return self.get_category_news(intent)
+        if intent is not None:
+            return getattr(self, INTENT_HANDLERS[intent])()
         
-        categories = ['technology', 'sports', 'business', 'finance', 'politics', 'health', 'science']
-        for category in categories:
-            if category in query_lower:
-                return self.get_category_news(category)
-        
-        if 'summarize' in query_lower or 'summary' in query_lower:
-            return self.get_top_stories()
-        
-        keywords = re.findall(r'\b[a-z]{4,}\b', query_lower)
-        stopwords = {'the', 'news', 'tell', 'show', 'what', 'latest', 'today', 'about', 'find'}
-        keywords = [k for k in keywords if k not in stopwords]
+        keywords = [k for k in _WORD_RE.findall(query_lower) if k not in QUERY_STOPWORDS]
         
         if keywords:
             return self.search_articles(keywords[0])
@@ -73,136 +250,129 @@ class ConversationalAgent:
         return "Try asking: 'Show me UK news' or 'What are the top stories?'"
     
     def handle_greeting(self):
-        return (
-            "Hello! I'm NewsGenie AI, your intelligent news assistant.\n\n"
-            "I can help you:\n"
-            "- Get latest headlines and UK news\n"
-            "- Find news on specific topics\n"
-            "- Analyze sentiment and trends\n"
-            "- Answer questions about the news\n\n"
-            "What would you like to know?"
-        )
+        return GREETING_MESSAGE
     
     def handle_help(self):
-        return (
-            "**Here's what I can do:**\n\n"
-            "**Get News:**\n"
-            "- What are the top stories?\n"
-            "- Show me UK news\n"
-            "- Latest sports/technology/business news\n\n"
-            "**Search & Analyze:**\n"
-            "- Tell me about [topic]\n"
-            "- What's trending?\n"
-            "- What's the sentiment?\n\n"
-            "**Statistics:**\n"
-            "- How many articles are there?\n"
-        )
+        return HELP_MESSAGE
     
     def get_uk_news(self):
-        uk_sources = ['BBC', 'Sky News', 'The Guardian', 'Independent', 'Telegraph']
-        uk_articles = [a for a in self.articles if any(s in a.get('source', '') for s in uk_sources)]
+        self._ensure_index()
+        uk_idx = self._uk_idx
         
-        if not uk_articles:
+        if not uk_idx:
             return "No UK news available right now. Try clicking 'Refresh News' in the sidebar."
         
-        response = f"**Latest UK News** ({len(uk_articles)} articles):\n\n"
-        for i, article in enumerate(uk_articles[:5], 1):
-            title = article.get('title', 'No title')
-            source = article.get('source', 'Unknown')
-            category = article.get('category', 'General')
-            response += f"{i}. **{title}**\n   {category} | {source}\n\n"
+        parts = [f"**Latest UK News** ({len(uk_idx)} articles):\n\n"]
+        for i, idx in enumerate(uk_idx[:5], 1):
+            article = self._records[idx]
+            parts.append(f"{i}. **{article.title}**\n   {article.category} | {article.source}\n\n")
         
-        if len(uk_articles) > 5:
-            response += f"...and {len(uk_articles) - 5} more UK articles available"
+        if len(uk_idx) > 5:
+            parts.append(f"...and {len(uk_idx) - 5} more UK articles available")
         
-        return response
+        return ''.join(parts)
     
     def get_top_stories(self):
         if not self.articles:
             return "No articles available."
         
-        response = "**Top Stories:**\n\n"
-        for i, article in enumerate(self.articles[:5], 1):
-            title = article.get('title', 'No title')
-            source = article.get('source', 'Unknown')
-            category = article.get('category', 'General')
-            sentiment = article.get('sentiment', {}).get('label', 'neutral')
-            response += f"{i}. **{title}**\n   {category} | {source} | Sentiment: {sentiment}\n\n"
-        return response
+        self._ensure_index()
+        parts = ["**Top Stories:**\n\n"]
+        for i, article in enumerate(self._records[:5], 1):
+            parts.append(
+                f"{i}. **{article.title}**\n   {article.category} | {article.source} | "
+                f"Sentiment: {article.sentiment_label}\n\n"
+            )
+        return ''.join(parts)
     
     def get_category_news(self, category):
+        self._ensure_index()
         category_title = category.title()
-        category_articles = [a for a in self.articles if a.get('category', '').lower() == category]
+        category_idx = self._by_category.get(category, ())
         
-        if not category_articles:
+        if not category_idx:
             return f"No {category_title} articles found."
         
-        response = f"**{category_title} News** ({len(category_articles)} articles):\n\n"
-        for i, article in enumerate(category_articles[:5], 1):
-            title = article.get('title', 'No title')
-            source = article.get('source', 'Unknown')
-            response += f"{i}. {title} ({source})\n"
+        parts = [f"**{category_title} News** ({len(category_idx)} articles):\n\n"]
+        for i, idx in enumerate(category_idx[:5], 1):
+            article = self._records[idx]
+            parts.append(f"{i}. {article.title} ({article.source})\n")
         
-        return response
+        return ''.join(parts)
     
     def get_trending(self):
         if not self.articles:
             return "No articles available."
         
-        words = []
-        stopwords = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'is', 'are', 'says'}
-        
-        for article in self.articles:
-            text = article.get('title', '').lower()
-            words.extend([w for w in re.findall(r'\b[a-z]{4,}\b', text) if w not in stopwords])
-        
-        counts = Counter(words)
-        response = "**Trending Topics:**\n\n"
-        for i, (word, count) in enumerate(counts.most_common(10), 1):
+        self._ensure_index()
+        parts = ["**Trending Topics:**\n\n"]
+        for i, (word, count) in enumerate(self._trending_counter.most_common(10), 1):
             bar = '=' * min(count, 20)
-            response += f"{i}. **{word.title()}** {bar} ({count})\n"
-        return response
+            parts.append(f"{i}. **{word.title()}** {bar} ({count})\n")
+        return ''.join(parts)
     
     def get_sentiment(self):
         if not self.articles:
             return "No articles available."
         
-        sentiments = [a.get('sentiment', {}).get('label', 'neutral') for a in self.articles]
-        positive = sentiments.count('positive')
-        negative = sentiments.count('negative')
-        neutral = sentiments.count('neutral')
-        total = len(sentiments)
-        
-        response = "**Overall Sentiment Analysis:**\n\n"
-        response += f"Positive: {positive} ({positive*100//total}%)\n"
-        response += f"Negative: {negative} ({negative*100//total}%)\n"
-        response += f"Neutral: {neutral} ({neutral*100//total}%)\n"
+        self._ensure_index()
+        positive = self._sentiment_counter['positive']
+        negative = self._sentiment_counter['negative']
+        neutral = self._sentiment_counter['neutral']
+        total = self._total
         
-        return response
+        return (
+            "**Overall Sentiment Analysis:**\n\n"
+            f"Positive: {positive} ({positive*100//total}%)\n"
+            f"Negative: {negative} ({negative*100//total}%)\n"
+            f"Neutral: {neutral} ({neutral*100//total}%)\n"
+        )
     
     def get_count(self):
-        total = len(self.articles)
-        categories = Counter([a.get('category', 'General') for a in self.articles])
-        
-        response = f"**Article Statistics:**\n\nTotal: {total} articles\n\n**By Category:**\n"
-        for category, count in categories.most_common():
-            response += f"{category}: {count}\n"
-        return response
+        self._ensure_index()
+        parts = [f"**Article Statistics:**\n\nTotal: {self._total} articles\n\n**By Category:**\n"]
+        parts.extend(f"{category}: {count}\n" for category, count in self._category_counter.most_common())
+        return ''.join(parts)
     
     def search_articles(self, keyword):
-        results = [a for a in self.articles if keyword.lower() in a.get('title', '').lower()]
+        self._ensure_index()
+        results = self._find_titles(keyword.lower())
         
         if not results:
             return f"No articles found about '{keyword}'."
         
-        response = f"**Found {len(results)} articles about '{keyword}':**\n\n"
-        for i, article in enumerate(results[:5], 1):
-            title = article.get('title', 'No title')
-            response += f"{i}. {title}\n"
-        return response
+        parts = [f"**Found {len(results)} articles about '{keyword}':**\n\n"]
+        for i, idx in enumerate(results[:5], 1):
+            parts.append(f"{i}. {self._records[idx].title}\n")
+        return ''.join(parts)
+    
+    def _find_titles(self, needle):
+        """Return indices of titles containing needle via one scan of the title blob."""
+        blob, offsets = self._titles_blob, self._title_offsets
+        results = []
+        pos = blob.find(needle) if offsets else -1
+        while pos != -1:
+            idx = bisect_right(offsets, pos) - 1
+            title_end = offsets[idx] + len(self._titles_lower[idx])
+            if pos + len(needle) <= title_end:
+                results.append(idx)
+                pos = title_end + 1
+            else:
+                # Match straddles the separator; keep looking from the next character.
+                pos += 1
+            pos = blob.find(needle, pos)
+        return results
     
     def clear_history(self):
-        self.conversation_history = []
+        self.conversation_history.clear()
     
     def get_conversation_history(self):
-        return self.conversation_history
+        """Return the history with timestamps converted to datetimes on read."""
+        return [
+            {
+                'role': entry['role'],
+                'content': entry['content'],
+                'timestamp': datetime.fromtimestamp(entry['timestamp_ns'] / 1e9)
+            }
+            for entry in self.conversation_history
+        ]
@@ -1,42 +1,161 @@
-from transformers import pipeline
+from transformers import AutoModelForSeq2SeqLM, AutoTokenizer, pipeline
+from collections import OrderedDict
+import asyncio
 import logging
+import threading
+
+import numpy as np
+import torch
+
+from config import (
+    EMBEDDING_MODEL, LLM_CACHE_SIZE, LLM_QUANTIZE_INT8, LLM_SEMANTIC_CACHE,
+    LLM_SEMANTIC_CACHE_THRESHOLD,
+)
 
 logger = logging.getLogger(__name__)
 
+try:
+    from sentence_transformers import SentenceTransformer
+    SENTENCE_TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    SENTENCE_TRANSFORMERS_AVAILABLE = False
+
 
 class LLMHandler:
     
+    # Pipelines are loaded on first use and shared by every handler instance.
+    _pipelines = {}
+    _pipelines_lock = threading.Lock()
+    
     def __init__(self):
         self.model_name = "google/flan-t5-small"
-        self.llm = None
-        self._initialize_model()
+        self._response_cache = OrderedDict()
+        self._embedder = None
+        self._sem_embs = None
+        self._sem_max_lengths = []
+        self._sem_responses = []
+    
+    @property
+    def llm(self):
+        pipelines = type(self)._pipelines
+        if self.model_name not in pipelines:
+            with type(self)._pipelines_lock:
+                if self.model_name not in pipelines:
+                    pipelines[self.model_name] = self._initialize_model()
+        return pipelines[self.model_name]
     
     def _initialize_model(self):
+        if LLM_QUANTIZE_INT8:
+            try:
+                return self._initialize_quantized_model()
+            except Exception as e:
+                logger.warning(f"Int8 quantization failed, falling back to FP32: {e}")
+        
         try:
             logger.info(f"Loading model: {self.model_name}")
-            self.llm = pipeline(
+            llm = pipeline(
                 "text2text-generation",
                 model=self.model_name,
                 max_length=256,
                 device=-1
             )
             logger.info("Model loaded successfully")
+            return llm
         except Exception as e:
             logger.error(f"Error loading model: {e}")
-            self.llm = None
+            return None
+    
+    def _initialize_quantized_model(self):
+        """Load the model with its Linear layers dynamically quantized to int8 for CPU inference."""
+        logger.info(f"Loading int8 model: {self.model_name}")
+        tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+        model = AutoModelForSeq2SeqLM.from_pretrained(self.model_name)
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        llm = pipeline(
+            "text2text-generation",
+            model=model,
+            tokenizer=tokenizer,
+            max_length=256,
+            device=-1
+        )
+        logger.info("Int8 model loaded successfully")
+        return llm
     
     def generate_response(self, prompt, max_length=256):
-        if not self.llm:
+        key = (prompt, max_length)
+        cached = self._response_cache.get(key)
+        if cached is not None:
+            self._response_cache.move_to_end(key)
+            return cached
+        
+        llm = self.llm
+        if not llm:
             return None
         
+        embedding = self._embed(prompt)
+        cached = self._semantic_lookup(embedding, max_length)
+        if cached is not None:
+            return cached
+        
         try:
-            response = self.llm(
+            response = llm(
                 prompt,
                 max_length=max_length,
                 num_return_sequences=1,
                 do_sample=False
             )
-            return response[0]['generated_text']
+            text = response[0]['generated_text']
         except Exception as e:
             logger.error(f"Error generating response: {e}")
             return None
+        
+        self._response_cache[key] = text
+        if len(self._response_cache) > LLM_CACHE_SIZE:
+            self._response_cache.popitem(last=False)
+        self._semantic_store(embedding, max_length, text)
+        return text
+    
+    def _embed(self, prompt):
+        """Return a unit-length embedding of the prompt, or None if the semantic cache is off."""
+        if not (LLM_SEMANTIC_CACHE and SENTENCE_TRANSFORMERS_AVAILABLE):
+            return None
+        
+        if self._embedder is None:
+            try:
+                self._embedder = SentenceTransformer(EMBEDDING_MODEL, device='cpu')
+            except Exception as e:
+                logger.error(f"Error loading embedding model: {e}")
+                self._embedder = False
+        if not self._embedder:
+            return None
+        
+        return self._embedder.encode(prompt, normalize_embeddings=True).astype(np.float32)
+    
+    def _semantic_lookup(self, embedding, max_length):
+        """Return a cached response for a near-identical earlier prompt, if any."""
+        if embedding is None or self._sem_embs is None:
+            return None
+        
+        sims = self._sem_embs @ embedding
+        sims[np.asarray(self._sem_max_lengths) != max_length] = -1.0
+        best = int(np.argmax(sims))
+        if sims[best] >= LLM_SEMANTIC_CACHE_THRESHOLD:
+            return self._sem_responses[best]
+        return None
+    
+    def _semantic_store(self, embedding, max_length, text):
+        if embedding is None:
+            return
+        
+        if self._sem_embs is None:
+            self._sem_embs = embedding[np.newaxis, :]
+        else:
+            self._sem_embs = np.vstack([self._sem_embs[-(LLM_CACHE_SIZE - 1):], embedding])
+            self._sem_max_lengths = self._sem_max_lengths[-(LLM_CACHE_SIZE - 1):]
+            self._sem_responses = self._sem_responses[-(LLM_CACHE_SIZE - 1):]
+        self._sem_max_lengths.append(max_length)
+        self._sem_responses.append(text)
+    
+    async def generate_response_async(self, prompt, max_length=256):
+        """Run generate_response in a worker thread so the event loop isn't blocked."""
+        return await asyncio.to_thread(self.generate_response, prompt, max_length)
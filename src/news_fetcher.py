@@ -1,21 +1,273 @@
 import feedparser
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional
-from datetime import datetime
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlencode, urljoin, urlsplit
+import dbm
+import heapq
+import json
 import logging
 import re
+import shelve
+import threading
 
-from config import NEWS_SOURCES, NEWS_API_KEY
+from dateutil import parser as date_parser
+
+from config import (
+    ENRICH_WORKERS, HTTP_CACHE_MAX_BYTES, HTTP_CACHE_PATH, NEWS_SOURCES, NEWS_API_KEY,
+    RSS_FETCH_WORKERS, RSS_MAX_BYTES,
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+_TRACKING_PARAM_PREFIXES = ('utm_', 'fbclid', 'gclid')
+_HTML_RE = re.compile(r'<[^>]+>')
+
+# HTTP_CACHE_PATH is one shelve for the whole process, and app.py builds a new
+# NewsFetcher per fetch, so every instance must serialize on the same lock.
+_HTTP_CACHE_LOCK = threading.Lock()
+
+
+def _canonical_url(url: str) -> str:
+    """Normalize a URL for duplicate detection.
+    
+    Drops the scheme, fragment and tracking query parameters and lowercases
+    the host, so http/https and utm_* variants of one article compare equal.
+    """
+    parts = urlsplit(url)
+    query = '&'.join(
+        kv for kv in parts.query.split('&')
+        if kv and not kv.startswith(_TRACKING_PARAM_PREFIXES)
+    )
+    return f"{parts.netloc.lower()}{parts.path}?{query}"
+
+
+def _to_epoch(published: str) -> float:
+    """Convert an ISO-8601 or RFC-822 timestamp to epoch seconds (0.0 if unparseable)."""
+    try:
+        return datetime.fromisoformat(published).timestamp()
+    except (TypeError, ValueError):
+        pass
+    try:
+        return parsedate_to_datetime(published).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _parse_published(published: str) -> str:
+    """Normalize a feed date to ISO-8601 (now, if it cannot be parsed).
+    
+    Feeds use ISO-8601 (Atom) or RFC-822 (RSS), which the stdlib parses
+    directly; dateutil's heuristics are only needed for anything else.
+    """
+    try:
+        return datetime.fromisoformat(published).isoformat()
+    except ValueError:
+        pass
+    try:
+        parsed = parsedate_to_datetime(published)
+        if parsed.tzinfo is None and published.rstrip().endswith('-0000'):
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.isoformat()
+    except (TypeError, ValueError):
+        pass
+    try:
+        return date_parser.parse(published).isoformat()
+    except (ValueError, OverflowError):
+        return datetime.now().isoformat()
+
+
 try:
     from newspaper import Article
     NEWSPAPER_AVAILABLE = True
 except ImportError:
     NEWSPAPER_AVAILABLE = False
 
+try:
+    from lxml import etree
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+_ATOM_NS = 'http://www.w3.org/2005/Atom'
+_RDF_NS = 'http://www.w3.org/1999/02/22-rdf-syntax-ns#'
+_RSS1_NS = 'http://purl.org/rss/1.0/'
+_CONTENT_NS = 'http://purl.org/rss/1.0/modules/content/'
+_DC_NS = 'http://purl.org/dc/elements/1.1/'
+
+# Feed elements (namespace, local name) -> the feedparser entry keys
+# fetch_from_rss reads. Extension elements such as media:title or
+# itunes:summary are not listed, so they never shadow the core fields.
+_FEED_FIELDS = {
+    (None, 'title'): 'title',
+    (None, 'link'): 'link',
+    (None, 'guid'): 'guid',
+    (None, 'description'): 'summary',
+    (None, 'pubDate'): 'published',
+    (None, 'author'): 'author',
+    (_ATOM_NS, 'title'): 'title',
+    (_ATOM_NS, 'link'): 'link',
+    (_ATOM_NS, 'summary'): 'summary',
+    (_ATOM_NS, 'content'): 'content',
+    (_ATOM_NS, 'published'): 'published',
+    (_ATOM_NS, 'updated'): 'updated',
+    (_ATOM_NS, 'author'): 'author',
+    (_RSS1_NS, 'title'): 'title',
+    (_RSS1_NS, 'link'): 'link',
+    (_RSS1_NS, 'description'): 'summary',
+    (_CONTENT_NS, 'encoded'): 'content',
+    (_DC_NS, 'date'): 'published',
+    (_DC_NS, 'creator'): 'author',
+}
+
+# Closing tag of an RSS item or Atom entry, used to cut a truncated body
+# back to its last complete entry.
+_ENTRY_END_RE = re.compile(rb'</(?:[\w.-]+:)?(?:item|entry)\s*>')
+
+
+def _qname(element):
+    qname = etree.QName(element)
+    return qname.namespace, qname.localname
+
+
+def _element_text(element) -> str:
+    return ''.join(element.itertext()).strip()
+
+
+def _resolve_link(link: str, element, default_base: Optional[str]) -> Optional[str]:
+    """Absolute http(s) URL for link, resolved against xml:base or default_base."""
+    base = element.base
+    base = urljoin(default_base, base) if base and default_base else (base or default_base)
+    if base:
+        link = urljoin(base, link)
+    parts = urlsplit(link)
+    if parts.scheme in ('http', 'https') and parts.netloc:
+        return link
+    return None
+
+
+def _parse_feed_xml(body: bytes, content_type: str = '', base_url: Optional[str] = None,
+                    truncated: bool = False):
+    """Parse RSS 2.0, RSS 1.0 or Atom bytes with lxml.
+    
+    Returns (feed, entries) shaped like feedparser's feed.feed and
+    feed.entries for the fields we use, or None when the document is not a
+    well-formed feed lxml can read, so the caller can fall back to feedparser.
+    HTML named entities (&nbsp;, &eacute;) are not XML, so feeds using them
+    go to feedparser, which decodes them.
+    
+    Relative links resolve against xml:base, then the channel link, then
+    base_url (the feed's own URL). When the body was cut off at the download
+    cap, it is parsed up to the end of its last complete entry; the only
+    error accepted then is the premature end of the unclosed channel.
+    """
+    if truncated:
+        last_end = None
+        for last_end in _ENTRY_END_RE.finditer(body):
+            pass
+        if last_end is None:
+            return None
+        body = body[:last_end.end()]
+    
+    charset = content_type.partition('charset=')[2].split(';')[0].strip(' "\'') or None
+    try:
+        parser = etree.XMLParser(
+            encoding=charset, recover=True, resolve_entities=False, no_network=True
+        )
+        root = etree.fromstring(body, parser=parser)
+    except (etree.LxmlError, LookupError, ValueError):
+        return None
+    if root is None:
+        return None
+    # recover=True keeps going past errors such as undeclared entities, but
+    # silently mangles the text around them.
+    for error in parser.error_log:
+        if error.level < etree.ErrorLevels.ERROR:
+            continue
+        if truncated and error.type == etree.ErrorTypes.ERR_TAG_NOT_FINISHED:
+            continue
+        return None
+    
+    kind = _qname(root)
+    if kind == (None, 'rss'):
+        channel = next((c for c in root if _qname(c) == (None, 'channel')), None)
+        if channel is None:
+            return None
+        header, items = channel, [c for c in channel if _qname(c) == (None, 'item')]
+    elif kind == (_RDF_NS, 'RDF'):
+        # RSS 1.0 items are siblings of the channel
+        header = next((c for c in root if _qname(c) == (_RSS1_NS, 'channel')), root)
+        items = [c for c in root if _qname(c) == (_RSS1_NS, 'item')]
+    elif kind == (_ATOM_NS, 'feed'):
+        header, items = root, [c for c in root if _qname(c) == (_ATOM_NS, 'entry')]
+    else:
+        return None
+    if not items:
+        return None
+    
+    feed = {}
+    site_link = None
+    for child in header:
+        if not isinstance(child.tag, str):
+            continue
+        name = _FEED_FIELDS.get(_qname(child))
+        if name == 'title' and 'title' not in feed:
+            feed['title'] = _element_text(child)
+        elif name == 'link' and site_link is None:
+            href = child.get('href')
+            if href is None:
+                site_link = _resolve_link(_element_text(child), child, base_url)
+            elif child.get('rel', 'alternate') == 'alternate':
+                site_link = _resolve_link(href.strip(), child, base_url)
+    default_base = site_link or base_url
+    
+    entries = []
+    for item in items:
+        entry = {}
+        link = guid = None
+        for child in item:
+            if not isinstance(child.tag, str):
+                continue  # comments and processing instructions
+            key = _FEED_FIELDS.get(_qname(child))
+            if key is None:
+                continue
+            if key == 'link':
+                href = child.get('href')
+                if href is not None:
+                    # Atom: the alternate link is the article itself
+                    if child.get('rel', 'alternate') != 'alternate':
+                        continue
+                    raw = href.strip()
+                else:
+                    raw = _element_text(child)
+                if link is None and raw:
+                    link = _resolve_link(raw, child, default_base)
+            elif key == 'guid':
+                # RSS: a guid is the article URL unless marked otherwise
+                if guid is None and child.get('isPermaLink', 'true').lower() != 'false':
+                    guid = _resolve_link(_element_text(child), child, default_base)
+            elif key in entry:
+                continue
+            elif key == 'author' and len(child):
+                # Atom: <author><name>...</name></author>
+                name = next((c for c in child if _qname(c) == (_ATOM_NS, 'name')), None)
+                entry['author'] = _element_text(name if name is not None else child)
+            else:
+                entry[key] = _element_text(child)
+        
+        if link or guid:
+            entry['link'] = link or guid
+        # Like feedparser, fall back to the full content when there is no summary
+        content = entry.pop('content', None)
+        if 'summary' not in entry and content is not None:
+            entry['summary'] = content
+        entries.append(entry)
+    
+    return feed, entries
+
 
 class NewsFetcher:
     """Fetch news from multiple sources including News API and RSS feeds."""
@@ -25,6 +277,7 @@ class NewsFetcher:
         self.news_api_url = 'https://newsapi.org/v2/top-headlines'
         self.rss_feeds = NEWS_SOURCES.get('rss_feeds', [])
         self.seen_urls = set()
+        self._local = threading.local()
         
         logger.info(f"Initialized NewsFetcher with {len(self.rss_feeds)} RSS feeds")
     
@@ -45,39 +298,37 @@ class NewsFetcher:
             if category and category.lower() != 'all':
                 params['category'] = category.lower()
             
-            response = requests.get(
-                self.news_api_url,
-                params=params,
-                timeout=10
-            )
-            response.raise_for_status()
-            
-            data = response.json()
+            body, _ = self._conditional_get(self.news_api_url, params=params)
+            data = json.loads(body)
             
             if data.get('status') != 'ok':
                 logger.error(f"News API error: {data.get('message', 'Unknown error')}")
                 return []
             
-            articles = []
+            # Filter on URL before building any dicts; a malformed payload is
+            # handled by the outer except rather than a try per article.
+            new_items = []
             for item in data.get('articles', []):
-                try:
-                    article = {
-                        'title': item.get('title', ''),
-                        'summary': item.get('description', ''),
-                        'url': item.get('url', ''),
-                        'source': item.get('source', {}).get('name', 'Unknown'),
-                        'published': item.get('publishedAt', datetime.now().isoformat()),
-                        'image': item.get('urlToImage', ''),
-                        'author': item.get('author', ''),
-                    }
-                    
-                    if article['url'] and article['url'] not in self.seen_urls:
-                        articles.append(article)
-                        self.seen_urls.add(article['url'])
-                
-                except Exception as e:
-                    logger.warning(f"Error parsing News API article: {e}")
-                    continue
+                url = item.get('url')
+                if url:
+                    url_key = _canonical_url(url)
+                    if url_key not in self.seen_urls:
+                        self.seen_urls.add(url_key)
+                        new_items.append(item)
+            
+            now = datetime.now().isoformat()
+            articles = [
+                {
+                    'title': item.get('title', ''),
+                    'summary': item.get('description', ''),
+                    'url': item['url'],
+                    'source': item.get('source', {}).get('name', 'Unknown'),
+                    'published': item.get('publishedAt', now),
+                    'image': item.get('urlToImage', ''),
+                    'author': item.get('author', ''),
+                }
+                for item in new_items
+            ]
             
             logger.info(f"Fetched {len(articles)} articles from News API")
             return articles
@@ -89,31 +340,141 @@ class NewsFetcher:
             logger.error(f"Unexpected error fetching from News API: {e}")
             return []
     
+    def _session(self):
+        """Return this thread's requests.Session so pooled workers reuse connections."""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+    
+    def _cache_get(self, key):
+        try:
+            with _HTTP_CACHE_LOCK, shelve.open(str(HTTP_CACHE_PATH)) as cache:
+                return cache.get(key)
+        except (OSError, dbm.error) as e:
+            logger.warning(f"HTTP cache unavailable: {e}")
+            return None
+    
+    def _cache_put(self, key, entry):
+        """Store a response in the disk cache.
+        
+        Without gdbm, shelve falls back to dbm.dumb, which appends a new copy
+        of a value whenever it grows and never reclaims the old space, so the
+        cache files only get bigger in a long-running deployment. Once they
+        pass HTTP_CACHE_MAX_BYTES they are deleted and the cache starts over;
+        the next request for each URL is then a plain GET.
+        """
+        try:
+            with _HTTP_CACHE_LOCK:
+                cache_files = [
+                    path for path in HTTP_CACHE_PATH.parent.glob(f"{HTTP_CACHE_PATH.name}*")
+                    if path.name == HTTP_CACHE_PATH.name or path.name.startswith(f"{HTTP_CACHE_PATH.name}.")
+                ]
+                if sum(path.stat().st_size for path in cache_files) > HTTP_CACHE_MAX_BYTES:
+                    logger.info("HTTP cache is over its size limit; starting a fresh one")
+                    for path in cache_files:
+                        path.unlink()
+                with shelve.open(str(HTTP_CACHE_PATH)) as cache:
+                    cache[key] = entry
+        except (OSError, dbm.error) as e:
+            logger.warning(f"HTTP cache unavailable: {e}")
+    
+    def _conditional_get(self, url, params=None, headers=None, max_bytes=None):
+        """GET a URL, revalidating against the disk cache with ETag/Last-Modified.
+        
+        Returns (body, content_type), taken from the cache when the server
+        answers 304 Not Modified. At most max_bytes are read when it is given.
+        """
+        # The API key is left out of the cache key so it is never written to disk.
+        query = urlencode(sorted((k, v) for k, v in (params or {}).items() if k != 'apiKey'))
+        key = f"{url}?{query}" if query else url
+        cached = self._cache_get(key)
+        
+        headers = dict(headers or {})
+        if cached:
+            if cached['etag']:
+                headers['If-None-Match'] = cached['etag']
+            if cached['last_modified']:
+                headers['If-Modified-Since'] = cached['last_modified']
+        
+        response = self._session().get(url, params=params, headers=headers, stream=True, timeout=10)
+        try:
+            if response.status_code == 304 and cached:
+                return cached['body'], cached.get('content_type', '')
+            response.raise_for_status()
+            body = bytearray()
+            for chunk in response.iter_content(chunk_size=8192):
+                body.extend(chunk)
+                if max_bytes and len(body) >= max_bytes:
+                    break
+            body = bytes(body)
+        finally:
+            response.close()
+        
+        content_type = response.headers.get('Content-Type', '')
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if etag or last_modified:
+            self._cache_put(key, {
+                'etag': etag,
+                'last_modified': last_modified,
+                'content_type': content_type,
+                'body': body,
+            })
+        return body, content_type
+    
+    def _download_feed(self, feed_url):
+        """Download at most RSS_MAX_BYTES of a feed; only the first entries are used.
+        
+        Returns (body, content_type, truncated), truncated being True when the
+        body stopped at the cap rather than at the end of the feed.
+        """
+        body, content_type = self._conditional_get(
+            feed_url,
+            headers={'User-Agent': feedparser.USER_AGENT},
+            max_bytes=RSS_MAX_BYTES
+        )
+        return body, content_type, len(body) >= RSS_MAX_BYTES
+    
     def fetch_from_rss(self, feed_url):
-        """Fetch news from an RSS feed."""
+        """Fetch news from an RSS feed.
+        
+        Runs on pool threads, so it does not touch self.seen_urls; fetch_all
+        removes duplicates across feeds afterwards.
+        """
         try:
-            feed = feedparser.parse(feed_url)
+            body, content_type, truncated = self._download_feed(feed_url)
             
-            if feed.bozo and not feed.entries:
-                logger.warning(f"Failed to parse RSS feed: {feed_url}")
-                return []
+            # lxml's C parser handles well-formed feeds (and truncated ones,
+            # with recover=True); anything else goes through feedparser.
+            parsed = (
+                _parse_feed_xml(body, content_type, feed_url, truncated) if LXML_AVAILABLE else None
+            )
+            if parsed is None:
+                # Hand feedparser the bytes we already have, plus the server's
+                # Content-Type so a declared charset is honoured; it never refetches.
+                headers = {'content-type': content_type} if content_type else None
+                feed = feedparser.parse(body, response_headers=headers)
+                
+                if feed.bozo and not feed.entries:
+                    logger.warning(f"Failed to parse RSS feed: {feed_url}")
+                    return []
+                
+                parsed = feed.feed, feed.entries
             
+            feed_info, entries = parsed
             articles = []
             
-            for entry in feed.entries[:20]:
+            for entry in entries[:20]:
                 try:
                     url = entry.get('link', '')
                     
-                    if not url or url in self.seen_urls:
+                    if not url:
                         continue
                     
                     published = entry.get('published', entry.get('updated', ''))
                     if published:
-                        try:
-                            from dateutil import parser
-                            published = parser.parse(published).isoformat()
-                        except:
-                            published = datetime.now().isoformat()
+                        published = _parse_published(published)
                     else:
                         published = datetime.now().isoformat()
                     
@@ -121,27 +482,28 @@ class NewsFetcher:
                     if hasattr(summary, 'value'):
                         summary = summary.value
                     
-                    summary = re.sub(r'<[^>]+>', '', str(summary))
+                    summary = str(summary)
+                    if '<' in summary:
+                        summary = _HTML_RE.sub('', summary)
                     
                     article = {
                         'title': entry.get('title', 'No Title'),
                         'summary': summary[:500],
                         'url': url,
-                        'source': feed.feed.get('title', 'RSS Feed'),
+                        'source': feed_info.get('title', 'RSS Feed'),
                         'published': published,
                         'image': '',
                         'author': entry.get('author', ''),
                     }
                     
                     articles.append(article)
-                    self.seen_urls.add(url)
                 
                 except Exception as e:
                     logger.warning(f"Error parsing RSS entry from {feed_url}: {e}")
                     continue
             
             if articles:
-                logger.info(f"Fetched {len(articles)} articles from {feed.feed.get('title', feed_url)}")
+                logger.info(f"Fetched {len(articles)} articles from {feed_info.get('title', feed_url)}")
             
             return articles
         
@@ -149,32 +511,42 @@ class NewsFetcher:
             logger.error(f"Error fetching RSS feed {feed_url}: {e}")
             return []
     
-    def fetch_all(self, category=None):
-        """Fetch news from all available sources."""
+    def fetch_all(self, category=None, enrich=None):
+        """Fetch news from all available sources.
+        
+        If enrich is given it is called on every returned article from a thread
+        pool, and its return values replace the articles (in the same order).
+        """
         all_articles = []
         self.seen_urls = set()
         
         logger.info("Starting to fetch news from all sources...")
         
-        try:
-            api_articles = self.fetch_from_news_api(category)
-            if api_articles:
-                all_articles.extend(api_articles)
-                logger.info(f"News API: {len(api_articles)} articles")
-        except Exception as e:
-            logger.warning(f"News API unavailable: {e}")
-        
-        logger.info(f"Fetching from {len(self.rss_feeds)} RSS feeds...")
-        
-        for i, feed_url in enumerate(self.rss_feeds, 1):
+        # All sources are network-bound, so the News API call and the feeds run
+        # concurrently; results are still collected API first, then feed order.
+        with ThreadPoolExecutor(max_workers=RSS_FETCH_WORKERS) as executor:
+            api_future = executor.submit(self.fetch_from_news_api, category)
+            
+            logger.info(f"Fetching from {len(self.rss_feeds)} RSS feeds...")
+            futures = [executor.submit(self.fetch_from_rss, feed_url) for feed_url in self.rss_feeds]
+            
             try:
-                rss_articles = self.fetch_from_rss(feed_url)
-                if rss_articles:
-                    all_articles.extend(rss_articles)
-                    logger.info(f"RSS Feed {i}/{len(self.rss_feeds)}: {len(rss_articles)} articles")
+                api_articles = api_future.result()
+                if api_articles:
+                    all_articles.extend(api_articles)
+                    logger.info(f"News API: {len(api_articles)} articles")
             except Exception as e:
-                logger.warning(f"RSS feed {i} failed: {e}")
-                continue
+                logger.warning(f"News API unavailable: {e}")
+            
+            for i, future in enumerate(futures, 1):
+                try:
+                    rss_articles = future.result()
+                    if rss_articles:
+                        all_articles.extend(rss_articles)
+                        logger.info(f"RSS Feed {i}/{len(self.rss_feeds)}: {len(rss_articles)} articles")
+                except Exception as e:
+                    logger.warning(f"RSS feed {i} failed: {e}")
+                    continue
         
         if not all_articles:
             logger.warning("No articles fetched from any source")
@@ -182,11 +554,17 @@ class NewsFetcher:
         
         all_articles = self._deduplicate(all_articles)
         
-        all_articles.sort(key=lambda x: x.get('published', ''), reverse=True)
-        
         logger.info(f"Total unique articles: {len(all_articles)}")
         
-        return all_articles[:100]
+        # Sources mix UTC offsets and formats, so order by parsed time rather than
+        # the raw string. nlargest evaluates the key once per article.
+        all_articles = heapq.nlargest(100, all_articles, key=lambda x: _to_epoch(x['published']))
+        
+        if enrich is not None:
+            with ThreadPoolExecutor(max_workers=ENRICH_WORKERS) as executor:
+                all_articles = list(executor.map(enrich, all_articles))
+        
+        return all_articles
     
     def _deduplicate(self, articles):
         """Remove duplicate articles based on URL and title similarity."""
@@ -198,8 +576,10 @@ class NewsFetcher:
             url = article.get('url', '')
             title = article.get('title', '').lower().strip()
             
-            if url and url in seen_urls:
-                continue
+            if url:
+                url = _canonical_url(url)
+                if url in seen_urls:
+                    continue
             
             title_key = ''.join(title.split()[:10])
             if title_key in seen_titles:
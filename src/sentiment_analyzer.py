@@ -1,10 +1,25 @@
-from textblob import TextBlob
+# TextBlob(text).sentiment is this same lexicon scorer, but each call builds a
+# blob and a fresh namedtuple class around the result; calling it directly
+# returns the identical (polarity, subjectivity) pair at about half the cost.
+from textblob.en import sentiment as pattern_sentiment
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from typing import List, Dict
 import logging
 
+from src.article_text import analysis_text
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+SENTIMENT_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=SENTIMENT_CACHE_SIZE)
+def _score(text: str):
+    """Memoized (polarity, subjectivity); feeds republish the same stories across refreshes."""
+    return tuple(pattern_sentiment(text))
+
 
 class SentimentAnalyzer:
     """Analyze sentiment of news articles."""
@@ -15,9 +30,7 @@ class SentimentAnalyzer:
             return {'polarity': 0.0, 'subjectivity': 0.0, 'label': 'neutral'}
         
         try:
-            blob = TextBlob(text)
-            polarity = blob.sentiment.polarity
-            subjectivity = blob.sentiment.subjectivity
+            polarity, subjectivity = _score(text)
             
             # Classify sentiment
             if polarity > 0.1:
@@ -37,10 +50,24 @@ class SentimentAnalyzer:
             logger.error(f"Error analyzing sentiment: {e}")
             return {'polarity': 0.0, 'subjectivity': 0.0, 'label': 'neutral'}
     
-    def analyze_batch(self, articles: List[Dict]) -> List[Dict]:
-        """Analyze sentiment for multiple articles."""
+    def analyze_batch(self, articles: List[Dict], n_jobs: int = 1) -> List[Dict]:
+        """Analyze sentiment for multiple articles.
+        
+        With n_jobs > 1 the texts are scored in that many worker processes.
+        Scoring is pure-Python CPU work, so threads would not help; process
+        start-up only pays off for batches of several thousand articles.
+        """
+        if n_jobs > 1 and len(articles) > 1:
+            texts = [analysis_text(article) for article in articles]
+            chunksize = max(1, len(texts) // (n_jobs * 4))
+            with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                results = executor.map(self.analyze_sentiment, texts, chunksize=chunksize)
+                for article, sentiment in zip(articles, results):
+                    article['sentiment'] = sentiment
+            return articles
+        
         for article in articles:
-            text = f"{article.get('title', '')} {article.get('summary', '')}"
+            text = analysis_text(article)
             article['sentiment'] = self.analyze_sentiment(text)
         
         return articles
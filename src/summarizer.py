@@ -1,3 +1,4 @@
+from collections import OrderedDict
 from typing import List, Dict
 import logging
 import re
@@ -5,6 +6,11 @@ import re
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+SUMMARY_CACHE_SIZE = 1024
+
+# Runs of text between sentence terminators (the pieces re.split would return)
+_SENT_RE = re.compile(r'[^.!?]+')
+
 
 class ArticleSummarizer:
     """Summarize news articles using extractive summarization."""
@@ -12,33 +18,53 @@ class ArticleSummarizer:
     def __init__(self, model_name: str = None):
         # Simple extractive summarization - no heavy models needed
         logger.info("Initialized simple summarizer")
+        # Summaries per (text, max_length, min_length); the same articles come
+        # back on every feed refresh.
+        self._summary_cache = OrderedDict()
     
     def summarize(self, text: str, max_length: int = 150, min_length: int = 50) -> str:
         """Generate summary using simple extractive method."""
         if not text:
             return ""
         
+        key = (text, max_length, min_length)
+        summary = self._summary_cache.get(key)
+        if summary is None:
+            summary = self._extract_summary(text, max_length)
+            self._summary_cache[key] = summary
+            if len(self._summary_cache) > SUMMARY_CACHE_SIZE:
+                self._summary_cache.popitem(last=False)
+        else:
+            self._summary_cache.move_to_end(key)
+        
+        return summary
+    
+    def _extract_summary(self, text: str, max_length: int) -> str:
+        """Leading sentences of text that fit in max_length characters."""
         try:
-            # Split into sentences
-            sentences = re.split(r'[.!?]+', text)
-            sentences = [s.strip() for s in sentences if s.strip()]
-            
-            if not sentences:
-                return text[:max_length] + "..."
-            
-            # Take first 2-3 sentences as summary
+            # Take first 2-3 sentences as summary, scanning lazily so the rest
+            # of a long article is never split
             summary_sentences = []
+            first_sentence = None
             current_length = 0
             
-            for sentence in sentences[:5]:  # Check first 5 sentences
-                if current_length + len(sentence) <= max_length:
-                    summary_sentences.append(sentence)
-                    current_length += len(sentence)
-                else:
+            for match in _SENT_RE.finditer(text):
+                sentence = match.group().strip()
+                if not sentence:
+                    continue
+                if first_sentence is None:
+                    first_sentence = sentence
+                # Check first 5 sentences
+                if len(summary_sentences) == 5 or current_length + len(sentence) > max_length:
                     break
+                summary_sentences.append(sentence)
+                current_length += len(sentence)
+            
+            if first_sentence is None:
+                return text[:max_length] + "..."
             
             if not summary_sentences:
-                summary_sentences = [sentences[0]]
+                summary_sentences = [first_sentence]
             
             summary = '. '.join(summary_sentences)
             if not summary.endswith('.'):
@@ -1,49 +1,78 @@
-from collections import Counter
+from collections import Counter, OrderedDict
 from typing import List, Dict
-import re
-from datetime import datetime, timedelta
 import logging
 
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import CountVectorizer
+
+from src.article_text import analysis_text
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+KEYWORD_CACHE_SIZE = 32
+_TOKEN_PATTERN = r'\b[a-z]{3,}\b'
+
 
 class TrendAnalyzer:
     """Analyze trends in news articles."""
     
     def __init__(self):
         # Common words to filter out
-        self.stop_words = set([
+        self.stop_words = frozenset([
             'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
             'of', 'with', 'by', 'from', 'up', 'about', 'into', 'through', 'during',
             'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had',
             'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might',
             'says', 'said', 'after', 'new', 'over', 'more', 'their', 'this', 'that'
         ])
+        # Shorter stop words can never match _TOKEN_PATTERN
+        self._vectorizer_stop_words = sorted(w for w in self.stop_words if len(w) >= 3)
+        # Document-term matrices per list of documents; Streamlit reruns
+        # re-request the same articles.
+        self._keyword_cache = OrderedDict()
+    
+    def _term_matrix(self, docs: List[str]):
+        """Count matrix (one row per document) and its vocabulary."""
+        key = tuple(docs)
+        entry = self._keyword_cache.get(key)
+        if entry is None:
+            vectorizer = CountVectorizer(
+                token_pattern=_TOKEN_PATTERN,
+                stop_words=self._vectorizer_stop_words,
+            )
+            try:
+                entry = (vectorizer.fit_transform(docs), vectorizer.get_feature_names_out())
+            except ValueError:
+                # No document contains a single keyword
+                entry = (None, None)
+            
+            self._keyword_cache[key] = entry
+            if len(self._keyword_cache) > KEYWORD_CACHE_SIZE:
+                self._keyword_cache.popitem(last=False)
+        else:
+            self._keyword_cache.move_to_end(key)
+        
+        return entry
+    
+    @staticmethod
+    def _top_terms(counts, vocabulary, top_n: int) -> List[tuple]:
+        """The top_n (term, count) pairs of a count matrix, most frequent first."""
+        if counts is None:
+            return []
+        sums = np.asarray(counts.sum(axis=0)).ravel()
+        top = np.argsort(-sums, kind='stable')[:top_n]
+        return [(str(vocabulary[i]), int(sums[i])) for i in top if sums[i] > 0]
     
     def extract_keywords(self, text: str, top_n: int = 20) -> List[tuple]:
         """Extract important keywords from text."""
-        # Clean and tokenize
-        text = text.lower()
-        words = re.findall(r'\b[a-z]{3,}\b', text)
-        
-        # Filter stop words
-        words = [w for w in words if w not in self.stop_words]
-        
-        # Count frequencies
-        word_freq = Counter(words)
-        
-        return word_freq.most_common(top_n)
+        return self._top_terms(*self._term_matrix([text]), top_n)
     
     def get_trending_topics(self, articles: List[Dict], top_n: int = 10) -> List[tuple]:
         """Identify trending topics across articles."""
-        all_text = " ".join([
-            f"{article.get('title', '')} {article.get('summary', '')}"
-            for article in articles
-        ])
-        
-        keywords = self.extract_keywords(all_text, top_n)
-        return keywords
+        docs = [analysis_text(article) for article in articles]
+        return self._top_terms(*self._term_matrix(docs), top_n)
     
     def get_source_distribution(self, articles: List[Dict]) -> Dict[str, int]:
         """Get distribution of articles by source."""
@@ -51,26 +80,16 @@ class TrendAnalyzer:
         return dict(Counter(sources).most_common(10))
     
     def get_temporal_trends(self, articles: List[Dict]) -> Dict[str, int]:
-        """Analyze article publication trends over time."""
-        dates = []
-        
-        for article in articles:
-            pub_date = article.get('published', '')
-            if pub_date:
-                try:
-                    # Parse various date formats
-                    if isinstance(pub_date, str):
-                        date_obj = datetime.fromisoformat(pub_date.replace('Z', '+00:00'))
-                    else:
-                        date_obj = pub_date
-                    
-                    dates.append(date_obj.date())
-                except:
-                    pass
+        """Analyze article publication trends over time (days in UTC)."""
+        # One vectorized parse; unparseable or missing dates become NaT and drop out
+        published = pd.to_datetime(
+            [article.get('published') for article in articles],
+            format='ISO8601', utc=True, errors='coerce'
+        ).dropna()
         
-        if dates:
-            date_counts = Counter(dates)
-            return {str(date): count for date, count in sorted(date_counts.items())}
+        if len(published):
+            date_counts = published.strftime('%Y-%m-%d').value_counts().sort_index()
+            return {date: int(count) for date, count in date_counts.items()}
         
         return {}
     
@@ -78,23 +97,22 @@ class TrendAnalyzer:
         """Analyze trends within each category."""
         category_trends = {}
         
-        # Group articles by category
+        # Group article rows by category
         by_category = {}
-        for article in articles:
+        for i, article in enumerate(articles):
             category = article.get('category', 'General')
             if category not in by_category:
                 by_category[category] = []
-            by_category[category].append(article)
+            by_category[category].append(i)
+        
+        # Vectorize every article once and slice each category's rows
+        docs = [analysis_text(article) for article in articles]
+        counts, vocabulary = self._term_matrix(docs)
         
-        # Get top keywords for each category
-        for category, cat_articles in by_category.items():
-            category_text = " ".join([
-                f"{article.get('title', '')} {article.get('summary', '')}"
-                for article in cat_articles
-            ])
-            keywords = self.extract_keywords(category_text, 5)
+        for category, rows in by_category.items():
+            keywords = self._top_terms(counts[rows] if counts is not None else None, vocabulary, 5)
             category_trends[category] = {
-                'count': len(cat_articles),
+                'count': len(rows),
                 'keywords': keywords
             }
         